@@ -1,8 +1,20 @@
-import base64
+import asyncio
+import pybase64
+import hashlib
+import io
+import httpx
+import orjson
 import requests
 import os
-from flask import Flask, render_template, request, jsonify
+import threading
+from cachetools.func import ttl_cache
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, render_template, request, Response, stream_with_context
 from flask_cors import CORS
+from ollama import AsyncClient, ResponseError
+from PIL import Image
 
 app = Flask(__name__)
 CORS(app)  # Important for web requests
@@ -17,15 +29,96 @@ VLM_MODELS = {
     "llava:latest": "Detailed Object Analysis (VLM)", 
 }
 TRANSLATOR_MODEL = "qwen2:7b" 
+TRANSLATOR_SYSTEM = "You translate English to the requested language. Output only the translation."
+MULTI_TRANSLATOR_SYSTEM = (
+    "You translate English to each requested language. "
+    "Output only a JSON object mapping each language name to its translation."
+)
+
+# How long Ollama keeps a model in memory after each call (sent with every request)
+KEEP_ALIVE = os.environ.get('OLLAMA_KEEP_ALIVE', '30m')
+
+# Languages each VLM can describe in directly, skipping the translator; unlisted models speak English only
+VLM_NATIVE_LANGS = {
+    "llava:latest": {"english", "chinese", "spanish", "french", "german"},
+}
+
+# --- HTTP Session ---
+# One keep-alive connection pool for every Ollama call instead of a new handshake per request
+SESSION = requests.Session()
+SESSION.headers["Connection"] = "keep-alive"
+# Fail fast on an unreachable host, but give inference the full read timeout
+CONNECT_TIMEOUT = 5
+# Retry only failed connects and idempotent GETs; a generate POST that dies mid-inference is not replayed
+_adapter = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        connect=2,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods={"GET"}
+    )
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# --- Response Cache ---
+# Bounded LRU of finished Ollama responses, keyed by content hash (per worker process)
+CACHE_MAX_ENTRIES = 256
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+def content_hash(data):
+    """Returns the sha256 hex digest of a str or bytes payload."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+def vlm_cache_key(vlm_model_name, image_hash, target_language):
+    """Keys a description on its prompt: short Amharic-bound English, or detailed in the output language."""
+    if target_language == 'Amharic':
+        return (vlm_model_name, image_hash, 'amharic')
+    return (vlm_model_name, image_hash, vlm_output_language(vlm_model_name, target_language).lower())
+
+def description_language(vlm_model_name, image_hash, target_language):
+    """Returns the language to prompt the VLM in, reusing a cached English description when there is one."""
+    if (cache_get(vlm_cache_key(vlm_model_name, image_hash, target_language)) is None
+            and cache_get(vlm_cache_key(vlm_model_name, image_hash, 'English')) is not None):
+        return 'English'
+    return target_language
+
+def translation_cache_key(english_description, target_language):
+    return (content_hash(english_description), target_language)
+
+def cache_get(key):
+    """Returns a cached response (marking it recently used), or None."""
+    with _response_cache_lock:
+        if key not in _response_cache:
+            return None
+        _response_cache.move_to_end(key)
+        return _response_cache[key]
+
+def cache_put(key, value):
+    """Stores a response, evicting the least recently used entry when full."""
+    with _response_cache_lock:
+        _response_cache[key] = value
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
 
 # --- API Check Function ---
+# The installed model list rarely changes, so /health polls from every tab share one Ollama hit per 30 s
+@ttl_cache(maxsize=1, ttl=30)
 def check_ollama_status():
     """Checks the health and model availability of the Ollama server."""
     try:
-        health_response = requests.get(f"{OLLAMA_HOST}/api/tags", timeout=10)
+        health_response = SESSION.get(f"{OLLAMA_HOST}/api/tags", timeout=(CONNECT_TIMEOUT, 10))
         health_response.raise_for_status()
 
-        installed_models = {model['name'] for model in health_response.json().get('models', [])}
+        installed_models = {model['name'] for model in orjson.loads(health_response.content).get('models', [])}
         required_models = set(VLM_MODELS.keys()) | {TRANSLATOR_MODEL}
         missing_models = required_models - installed_models
 
@@ -42,96 +135,424 @@ def check_ollama_status():
     except requests.exceptions.RequestException as e:
         return {"status": "Error", "message": f"Status Error ({getattr(e.response, 'status_code', 'N/A')})"}, 503
 
+def get_loaded_models():
+    """Returns the models currently in Ollama memory; /api/ps is far smaller than /api/tags."""
+    try:
+        ps_response = SESSION.get(f"{OLLAMA_HOST}/api/ps", timeout=(CONNECT_TIMEOUT, 5))
+        ps_response.raise_for_status()
+        return {model['name'] for model in orjson.loads(ps_response.content).get('models', [])}
+    except requests.exceptions.RequestException:
+        return set()
+
+# --- Image Helpers ---
+# moondream and llava see ~336-378px tiles; 768px keeps detail for llava's tiled input while
+# staying far below a raw camera upload
+MAX_IMAGE_SIDE = 768
+
+def downscale_image(image_bytes):
+    """Shrinks an image to the VLM input resolution; returns it unchanged if already small or unreadable."""
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        if max(img.size) <= MAX_IMAGE_SIDE:
+            return image_bytes
+        # JPEGs decode straight to a reduced DCT scale near the target instead of full size
+        scale = MAX_IMAGE_SIDE / max(img.size)
+        img.draft("RGB", (round(img.width * scale), round(img.height * scale)))
+        img.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.convert("RGB").save(buf, "JPEG", quality=85, optimize=True)
+        return buf.getvalue()
+    except (OSError, ValueError):
+        return image_bytes
+
+def is_decompression_bomb(image_bytes):
+    """Returns True if the image declares more pixels than Pillow will safely decode."""
+    try:
+        Image.open(io.BytesIO(image_bytes))
+    except Image.DecompressionBombError:
+        return True
+    except (OSError, ValueError):
+        pass  # Unreadable images are forwarded unchanged and Ollama reports them
+    return False
+
+def encode_image(image_bytes):
+    """Downscales an uploaded image and base64-encodes it once for Ollama."""
+    return pybase64.b64encode(downscale_image(image_bytes)).decode('ascii')
+
+# --- Model Warmup ---
+def warm_up_models():
+    """Loads every model into Ollama memory so the first real request doesn't stall on a model load."""
+    loaded_models = get_loaded_models()
+    for model in [*VLM_MODELS, TRANSLATOR_MODEL]:
+        if model in loaded_models:
+            continue
+        try:
+            # An empty prompt only loads the model
+            SESSION.post(
+                f"{OLLAMA_HOST}/api/generate",
+                data=orjson.dumps({"model": model, "prompt": "", "keep_alive": KEEP_ALIVE}),
+                headers={"Content-Type": "application/json"},
+                timeout=(CONNECT_TIMEOUT, 300)
+            )
+        except requests.exceptions.RequestException:
+            pass  # Best effort; the first real request will load the model instead
+
+# --- Prompt Helpers ---
+def normalize_language(language):
+    """Returns a trimmed, consistently cased language name (' amharic' -> 'Amharic'), or None if blank."""
+    if not isinstance(language, str) or not language.strip():
+        return None
+    return language.strip().title()
+
+def normalize_languages(languages):
+    """Normalizes a language list (or a single name), dropping blanks and duplicates."""
+    if isinstance(languages, str):
+        languages = [languages]
+    if not isinstance(languages, list):
+        return []
+    return list(dict.fromkeys(filter(None, map(normalize_language, languages))))
+
+def vlm_output_language(vlm_model_name, target_language):
+    """Returns the target language if the VLM can describe in it directly, otherwise English."""
+    if target_language.lower() in VLM_NATIVE_LANGS.get(vlm_model_name, {"english"}):
+        return target_language
+    return 'English'
+
+def build_vlm_prompt(vlm_model_name, target_language):
+    """Returns the description prompt; Amharic gets a short English sentence to help translation."""
+    # Prefill cost scales with prompt tokens, so keep these terse
+    if target_language == 'Amharic':
+        return "Describe the image in a single, short sentence in English."
+    prompt = "Describe this image in detail. List: objects, actions, scene."
+    output_language = vlm_output_language(vlm_model_name, target_language)
+    if output_language.lower() != 'english':
+        prompt += f" Respond in {output_language}."
+    return prompt
+
+def build_translation_prompt(english_description, target_language):
+    """Returns the translator prompt; the instructions live in TRANSLATOR_SYSTEM."""
+    return f"{target_language}: {english_description}"
+
+def build_multi_translation_prompt(english_description, target_languages):
+    """Returns the prompt for translating into several languages at once as a JSON object."""
+    return f"{orjson.dumps(target_languages).decode()}: {english_description}"
+
+# --- Generation Options ---
+# Decode is per token and dominates Ollama wall-time, so bound every response
+VLM_CONTEXT_TOKENS = 2048
+# Budget per English word; Amharic and CJK scripts take several tokens per word
+TRANSLATION_TOKENS_PER_WORD = 4
+MIN_TRANSLATION_TOKENS = 64
+
+def build_vlm_options(target_language):
+    """Returns Ollama options for the VLM; the Amharic path only needs one short sentence."""
+    return {
+        "num_predict": 120 if target_language == 'Amharic' else 400,
+        "num_ctx": VLM_CONTEXT_TOKENS,
+        "temperature": 0.2,
+        "top_p": 0.9
+    }
+
+def build_translation_options(english_description, language_count=1):
+    """Returns Ollama options for the translator, capping output relative to the source length."""
+    budget = max(MIN_TRANSLATION_TOKENS, TRANSLATION_TOKENS_PER_WORD * len(english_description.split()))
+    return {
+        "num_predict": budget * language_count,
+        "temperature": 0.2,
+        "top_p": 0.9
+    }
+
+# --- Streaming Helpers ---
+def stream_ollama(payload, timeout):
+    """Yields response tokens from Ollama's streaming /api/generate endpoint."""
+    with SESSION.post(
+        f"{OLLAMA_HOST}/api/generate",
+        data=orjson.dumps(payload),
+        headers={"Content-Type": "application/json"},
+        stream=True,
+        timeout=(CONNECT_TIMEOUT, timeout)
+    ) as response:
+        response.raise_for_status()
+
+        for line in response.iter_lines():
+            if not line:
+                continue
+            try:
+                chunk = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                raise requests.exceptions.RequestException(f"Invalid stream chunk from Ollama: {e}") from e
+            if 'error' in chunk:
+                raise requests.exceptions.RequestException(chunk['error'])
+            yield chunk.get("response", "")
+            if chunk.get("done"):
+                break
+
+def cached_stream(key, make_stream):
+    """Yields a cached response in one piece, or streams a fresh one and caches it once complete."""
+    cached = cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    tokens = []
+    for token in make_stream():
+        tokens.append(token)
+        yield token
+
+    response = "".join(tokens).strip()
+    if response:
+        cache_put(key, response)
+
+def sse_event(**data):
+    """Formats a single Server-Sent Event carrying a JSON payload."""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+# --- JSON Helpers ---
+# orjson is several times faster than jsonify/json on the multi-MB base64 image payloads
+def json_response(obj, status=200):
+    """Returns a JSON response serialized with orjson."""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+def read_generate_request():
+    """Returns the request fields, the raw bytes of each uploaded image, and whether a list was sent.
+
+    Accepts multipart/form-data with image files (no client-side base64, a third smaller
+    on the wire) or the original JSON body carrying base64 strings.
+    """
+    if request.files:
+        fields = request.form.to_dict()
+        fields['languages'] = request.form.getlist('languages')
+        multiple = 'images' in request.files
+        uploads = request.files.getlist('images' if multiple else 'image')
+        return fields, [upload.read() for upload in uploads], multiple
+
+    fields = read_json_body()
+    multiple = 'images' in fields
+    encoded = fields.get('images') if multiple else [fields.get('image')]
+    try:
+        # Line-wrapped base64 (GNU base64, base64.encodebytes) is valid input; only strip the wrapping
+        images = [pybase64.b64decode("".join(image.split()), validate=True) for image in encoded]
+    except (AttributeError, TypeError, ValueError):
+        images = []
+    return fields, images, multiple
+
+def read_json_body():
+    """Parses the request body with orjson; returns an empty dict if it isn't a JSON object."""
+    try:
+        data = orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
 # --- Flask Routes ---
 @app.route('/')
 def index():
-    ollama_status, _ = check_ollama_status()
+    # The page polls /health itself, so rendering never waits on Ollama
     return render_template('index.html', 
-                           ollama_status=ollama_status['message'], 
+                           ollama_status="Ollama Connection: checking...", 
                            models=VLM_MODELS)
 
 @app.route('/health')
 def health_check():
     status, code = check_ollama_status()
-    return jsonify(status), code
+    return json_response(status, code)
 
 @app.route('/generate', methods=['POST'])
 def generate_response():
-    data = request.json
+    data, images, _ = read_generate_request()
     vlm_model_name = data.get('model') 
-    image_base64 = data.get('image')
-    target_language = data.get('language')
+    image_bytes = images[0] if images else None
+    # Normalized so ' english' or 'AMHARIC' hit the same prompts and cache keys as the UI values
+    target_language = normalize_language(data.get('language'))
     
     # --- Validation ---
-    if not vlm_model_name or not target_language or not image_base64:
-        return jsonify({"response": "Error: Model, language, and image selection are required."}), 400
+    if not vlm_model_name or not target_language or not image_bytes:
+        return json_response({"response": "Error: Model, language, and image selection are required."}, 400)
+    if is_decompression_bomb(image_bytes):
+        return json_response({"response": "Error: Image is too large to process."}, 400)
     
     # --- STEP 1: Generate English Description ---
-    if target_language == 'Amharic':
-        vlm_prompt = "Describe the image in a single, short sentence in English."
-    else:
-        vlm_prompt = (
-            "Provide a highly detailed and exhaustive description of the image. "
-            "List all visible objects, their actions, their spatial relationship, and the overall context "
-            "of the scene in English."
-        )
-    
-    vlm_payload = {
-        "model": vlm_model_name,
-        "prompt": vlm_prompt, 
-        "images": [image_base64],
-        "stream": False 
-    }
+    # Switching language on an already described image only pays for the translator
+    image_hash = content_hash(image_bytes)
+    prompt_language = description_language(vlm_model_name, image_hash, target_language)
+    vlm_key = vlm_cache_key(vlm_model_name, image_hash, prompt_language)
 
-    try:
-        vlm_response = requests.post(
-            f"{OLLAMA_HOST}/api/generate",
-            json=vlm_payload,
-            timeout=180 
-        )
-        vlm_response.raise_for_status()
-        
-        english_description = vlm_response.json().get("response")
+    def stream_vlm():
+        # Resize only on a cache miss; the key is the hash of the original upload
+        vlm_payload = {
+            "model": vlm_model_name,
+            "prompt": build_vlm_prompt(vlm_model_name, prompt_language), 
+            "images": [encode_image(image_bytes)],
+            "options": build_vlm_options(prompt_language),
+            "stream": True,
+            "keep_alive": KEEP_ALIVE
+        }
+        return stream_ollama(vlm_payload, timeout=180)
+
+    def generate():
+        english_tokens = []
+        try:
+            for token in cached_stream(vlm_key, stream_vlm):
+                english_tokens.append(token)
+                yield sse_event(stage="vlm", token=token)
+        except requests.exceptions.RequestException as e:
+            yield sse_event(error=f"VLM Error: Could not connect to Ollama server. Details: {e}")
+            return
+
+        english_description = "".join(english_tokens).strip()
         if not english_description:
-            return jsonify({"response": f"Error: Failed to get English description from {vlm_model_name}."}), 500
+            yield sse_event(error=f"Error: Failed to get a description from {vlm_model_name}.")
+            return
 
-    except requests.exceptions.RequestException as e:
-        return jsonify({"response": f"VLM Error: Could not connect to Ollama server. Details: {e}"}), 500
-    
-    # If target language is English, return directly
-    if target_language.lower() == 'english':
-        return jsonify({"response": english_description}), 200
-        
-    # --- STEP 2: Translate Description ---
-    translation_prompt = (
-        f"Translate the following English description into the {target_language} language. "
-        f"Provide ONLY the translated text, nothing else. "
-        f"Description:\n\n'{english_description}'"
+        # If the VLM already described in the target language, the streamed description is the result
+        if vlm_output_language(vlm_model_name, prompt_language) == target_language:
+            return
+
+        # --- STEP 2: Translate Description ---
+        translation_payload = {
+            "model": TRANSLATOR_MODEL,
+            "system": TRANSLATOR_SYSTEM,
+            "prompt": build_translation_prompt(english_description, target_language), 
+            "options": build_translation_options(english_description),
+            "stream": True,
+            "keep_alive": KEEP_ALIVE
+        }
+
+        translated_tokens = []
+        try:
+            translation_key = translation_cache_key(english_description, target_language)
+            for token in cached_stream(translation_key, lambda: stream_ollama(translation_payload, timeout=60)):
+                translated_tokens.append(token)
+                yield sse_event(stage="translation", token=token)
+        except requests.exceptions.RequestException:
+            yield sse_event(error=f"Translation Error: Could not translate to {target_language}.")
+            return
+
+        if not "".join(translated_tokens).strip() and target_language == 'Amharic':
+            yield sse_event(error=f"Translation failed for {target_language}.")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-    translation_payload = {
-        "model": TRANSLATOR_MODEL,
-        "prompt": translation_prompt, 
-        "stream": False 
-    }
+async def describe_image_async(client, vlm_model_name, image_bytes, target_languages):
+    """Describes one image, then translates it into every target language in one translator call."""
+    # A single target goes straight to the VLM (fused, or the short Amharic prompt);
+    # several share one English description
+    image_hash = content_hash(image_bytes)
+    prompt_language = 'English'
+    if len(set(target_languages)) == 1:
+        prompt_language = description_language(vlm_model_name, image_hash, target_languages[0])
+    output_language = vlm_output_language(vlm_model_name, prompt_language)
 
-    try:
-        translation_response = requests.post(
-            f"{OLLAMA_HOST}/api/generate",
-            json=translation_payload,
-            timeout=60
+    vlm_key = vlm_cache_key(vlm_model_name, image_hash, prompt_language)
+
+    english_description = cache_get(vlm_key)
+    if english_description is None:
+        vlm_result = await client.generate(
+            model=vlm_model_name,
+            prompt=build_vlm_prompt(vlm_model_name, prompt_language),
+            images=[encode_image(image_bytes)],
+            options=build_vlm_options(prompt_language),
+            keep_alive=KEEP_ALIVE
         )
-        translation_response.raise_for_status()
-        
-        translated_text = translation_response.json().get("response", "Translation Failed.").strip()
-        
-        if not translated_text and target_language == 'Amharic':
-             return jsonify({"response": f"Translation failed for {target_language}."}), 500
+        english_description = vlm_result['response'].strip()
+        if not english_description:
+            raise ResponseError(f"Failed to get a description from {vlm_model_name}.")
+        cache_put(vlm_key, english_description)
 
-        return jsonify({"response": translated_text}), 200
+    # When the VLM answered in a target language there is nothing left to translate for it
+    responses = {}
+    missing = []
+    for lang in target_languages:
+        if lang.lower() == output_language.lower():
+            responses[lang] = english_description
+            continue
+        cached = cache_get(translation_cache_key(english_description, lang))
+        if cached is None:
+            missing.append(lang)
+        else:
+            responses[lang] = cached
 
-    except requests.exceptions.RequestException as e:
-        return jsonify({"response": f"Translation Error: Could not translate to {target_language}."}), 500
+    # One translator call (one prefill) covers every missing language
+    if len(missing) > 1:
+        result = await client.generate(
+            model=TRANSLATOR_MODEL,
+            system=MULTI_TRANSLATOR_SYSTEM,
+            prompt=build_multi_translation_prompt(english_description, missing),
+            format="json",
+            options=build_translation_options(english_description, len(missing)),
+            keep_alive=KEEP_ALIVE
+        )
+        try:
+            translations = orjson.loads(result['response'])
+        except orjson.JSONDecodeError:
+            translations = {}
+        for lang in missing:
+            translated_text = translations.get(lang) if isinstance(translations, dict) else None
+            if isinstance(translated_text, str) and translated_text.strip():
+                responses[lang] = translated_text.strip()
+                cache_put(translation_cache_key(english_description, lang), responses[lang])
+        missing = [lang for lang in missing if lang not in responses]
+
+    # Fall back to concurrent single-language calls for anything the JSON reply left out
+    tasks = [
+        client.generate(
+            model=TRANSLATOR_MODEL,
+            system=TRANSLATOR_SYSTEM,
+            prompt=build_translation_prompt(english_description, lang),
+            options=build_translation_options(english_description),
+            keep_alive=KEEP_ALIVE
+        )
+        for lang in missing
+    ]
+    results = await asyncio.gather(*tasks)
+    for lang, result in zip(missing, results):
+        responses[lang] = result['response'].strip()
+        if responses[lang]:
+            cache_put(translation_cache_key(english_description, lang), responses[lang])
+    return responses
+
+async def generate_response_async(vlm_model_name, images, target_languages):
+    """Describes every image concurrently so Ollama can schedule them together."""
+    async with AsyncClient(
+        host=OLLAMA_HOST,
+        timeout=httpx.Timeout(180, connect=CONNECT_TIMEOUT),
+        transport=httpx.AsyncHTTPTransport(retries=2)  # Retries connect failures only
+    ) as client:
+        tasks = [
+            describe_image_async(client, vlm_model_name, image_bytes, target_languages)
+            for image_bytes in images
+        ]
+        return await asyncio.gather(*tasks)
+
+@app.route('/generate/batch', methods=['POST'])
+async def generate_batch_response():
+    data, images, multiple = read_generate_request()
+    vlm_model_name = data.get('model')
+    target_languages = normalize_languages(data.get('languages'))
+
+    # --- Validation ---
+    if not vlm_model_name or not target_languages or not images or not all(images):
+        return json_response({"response": "Error: Model, languages, and image selection are required."}, 400)
+    if any(is_decompression_bomb(image_bytes) for image_bytes in images):
+        return json_response({"response": "Error: Image is too large to process."}, 400)
+
+    try:
+        responses = await generate_response_async(vlm_model_name, images, target_languages)
+    except (ResponseError, ConnectionError, httpx.HTTPError) as e:
+        return json_response({"response": f"Ollama Error: Could not complete the batch request. Details: {e}"}, 500)
+
+    # A single 'image' keeps the original response shape; 'images' gets one entry per image
+    if not multiple:
+        responses = responses[0]
+    return json_response({"responses": responses}, 200)
 
 if __name__ == '__main__':
+    ollama_status, _ = check_ollama_status()
+    if ollama_status['status'] != 'Error':
+        threading.Thread(target=warm_up_models, daemon=True).start()
+
     app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,29 @@
+# Gunicorn settings for serving app.py: gunicorn -c gunicorn_conf.py app:app
+import os
+import threading
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Requests spend their time waiting on Ollama, so threads let users overlap
+worker_class = "gthread"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = 8
+
+# A detailed VLM description plus a translation can take minutes on CPU
+timeout = 240
+keepalive = 5
+
+
+def post_worker_init(worker):
+    """Preloads the Ollama models from the first worker only.
+
+    The master never imports app, so each worker builds its own SESSION after the fork
+    instead of inheriting the master's keep-alive sockets to Ollama.
+    """
+    if worker.age != 1:
+        return
+    from app import check_ollama_status, warm_up_models
+
+    ollama_status, _ = check_ollama_status()
+    if ollama_status['status'] != 'Error':
+        threading.Thread(target=warm_up_models, daemon=True).start()
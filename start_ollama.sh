@@ -5,12 +5,23 @@
 
 echo "🚀 Starting Ollama Server..."
 
+# Keep both VLMs and the translator resident together and serve parallel requests
+export OLLAMA_NUM_PARALLEL=${OLLAMA_NUM_PARALLEL:-4}
+export OLLAMA_MAX_LOADED_MODELS=${OLLAMA_MAX_LOADED_MODELS:-3}
+export OLLAMA_KEEP_ALIVE=${OLLAMA_KEEP_ALIVE:-30m}
+
 # Start Ollama in background
 ollama serve &
 OLLAMA_PID=$!
 
-# Wait for server to start
-sleep 5
+# Wait until the server answers instead of guessing with a fixed sleep
+until curl -sf http://localhost:11434/api/version > /dev/null; do
+    if ! kill -0 $OLLAMA_PID 2>/dev/null; then
+        echo "❌ Ollama server exited during startup"
+        exit 1
+    fi
+    sleep 0.1
+done
 
 echo "📦 Checking/Downloading models..."
 
@@ -1,16 +1,49 @@
 import streamlit as st
-import requests
-import base64
-import time
+import asyncio
+import pybase64
+import hashlib
+import httpx
+import io
+import orjson
+import threading
+from cachetools import TTLCache
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from PIL import Image
 
 # ========== CONFIGURATION ==========
 OLLAMA_HOST = st.secrets.get("OLLAMA_HOST", "http://localhost:11434")
+# Keep the VLM and translator resident between the two stages and between uploads
+KEEP_ALIVE = st.secrets.get("OLLAMA_KEEP_ALIVE", "30m")
 
 VLM_MODELS = {
     "moondream:1.8b": "Fast & Lightweight",
     "llava:latest": "Detailed & Accurate",
 }
 TRANSLATOR_MODEL = "qwen2:7b"
+TRANSLATOR_SYSTEM = "You translate English to the requested language. Output only the translation."
+MULTI_TRANSLATOR_SYSTEM = (
+    "You translate English to each requested language. "
+    "Output only a JSON object mapping each language name to its translation."
+)
+
+LANGUAGES = ["English", "Chinese", "Amharic", "French", "Spanish"]
+
+# Languages each VLM can describe in directly; unlisted models speak English only
+VLM_NATIVE_LANGS = {
+    "llava:latest": {"english", "chinese", "spanish", "french", "german"},
+}
+CACHE_MAX_ENTRIES = 256
+CACHE_TTL_SECONDS = 3600
+IMAGE_CACHE_MAX_ENTRIES = 64
+# moondream and llava see ~336-378px tiles; 768px keeps detail for llava's tiled input while
+# staying far below a raw camera upload
+MAX_IMAGE_SIDE = 768
+# Output caps: decode time dominates, and Amharic/CJK take several tokens per English word
+VLM_CONTEXT_TOKENS = 2048
+TRANSLATION_TOKENS_PER_WORD = 4
+MIN_TRANSLATION_TOKENS = 64
+# Fail fast on a dead ngrok tunnel, but give inference the full read timeout
+CONNECT_TIMEOUT = 5
 
 # ========== PAGE SETUP ==========
 st.set_page_config(
@@ -53,12 +86,87 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ========== HELPER FUNCTIONS ==========
-def test_ollama_connection():
-    """Test if Ollama server is accessible"""
+@st.cache_resource
+def get_http_client(host):
+    """HTTP/2 keep-alive client per Ollama host, shared by every rerun and session"""
+    return httpx.Client(
+        base_url=host,
+        timeout=httpx.Timeout(120.0, connect=CONNECT_TIMEOUT),
+        # Transport retries only cover failed connects, so a generate call is never replayed
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+        )
+    )
+
+@st.cache_resource
+def get_executor():
+    """Worker pool for background work, shared instead of spun up on every rerun"""
+    return ThreadPoolExecutor(max_workers=4)
+
+@st.cache_resource
+def get_warm_up_executor():
+    """Separate pool for model warm-ups, which can block for minutes while weights load"""
+    return ThreadPoolExecutor(max_workers=2)
+
+@st.cache_resource
+def get_warming_models():
+    """(host, model) pairs with a warm-up in flight, plus a count of finished ones, shared by every session"""
+    return {"warming": set(), "finished": 0}, threading.Lock()
+
+def warm_up_state(host, model):
+    """Return (whether the model is warming, finished warm-up count) for status checks"""
+    state, lock = get_warming_models()
+    with lock:
+        return (host, model) in state["warming"], state["finished"]
+
+@st.cache_resource
+def get_response_cache():
+    """LRU of finished Ollama responses (expiring after an hour), shared by every session in this process"""
+    # Keyed by image/text hash, so the multi-MB base64 payload never enters the key
+    return TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS), threading.Lock()
+
+@st.cache_resource
+def get_image_cache():
+    """Downscaled base64 images keyed by the hash of the original upload"""
+    return TTLCache(maxsize=IMAGE_CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS), threading.Lock()
+
+def cache_get(key):
+    """Return a cached response (marking it recently used), or None"""
+    cache, lock = get_response_cache()
+    with lock:
+        return cache.get(key)
+
+def cache_put(key, value):
+    """Store a response, evicting the least recently used entry when full"""
+    cache, lock = get_response_cache()
+    with lock:
+        cache[key] = value
+
+def cached_stream(key, make_stream):
+    """Yield a cached response, or stream a fresh one and cache it once complete"""
+    cached = cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+    
+    tokens = []
+    for token in make_stream():
+        tokens.append(token)
+        yield token
+    
+    response = "".join(tokens).strip()
+    if response:
+        cache_put(key, response)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def test_ollama_connection(host_url):
+    """Test if Ollama server is accessible (cached for 30s per host across reruns)"""
     try:
-        response = requests.get(f"{OLLAMA_HOST}/api/tags", timeout=10)
+        response = get_http_client(host_url).get("/api/tags", timeout=httpx.Timeout(10, connect=CONNECT_TIMEOUT))
         if response.status_code == 200:
-            models = [m['name'] for m in response.json().get('models', [])]
+            models = [m['name'] for m in orjson.loads(response.content).get('models', [])]
             required = list(VLM_MODELS.keys()) + [TRANSLATOR_MODEL]
             missing = [m for m in required if m not in models]
             
@@ -69,55 +177,395 @@ def test_ollama_connection():
     except Exception as e:
         return False, f"❌ Connection failed: {str(e)}"
 
-def generate_description(model, image_base64, language):
-    """Generate description using Ollama"""
+@st.cache_data(ttl=10, show_spinner=False)
+def get_loaded_models(host_url, warm_ups_finished=0):
+    """Names of the models Ollama currently holds in memory, or None if /api/ps is unreachable
+
+    Passing the finished warm-up count refreshes the cached list as soon as a warm-up completes
+    """
     try:
-        # Step 1: Generate English description
-        if language == 'Amharic':
-            prompt = "Describe this image in one short English sentence."
+        response = get_http_client(host_url).get("/api/ps", timeout=httpx.Timeout(5, connect=CONNECT_TIMEOUT))
+        response.raise_for_status()
+        return {m['name'] for m in orjson.loads(response.content).get('models', [])}
+    except (httpx.HTTPError, ValueError):
+        return None
+
+def downscale_image(image_bytes):
+    """Shrink the image to the VLM input resolution; returns it unchanged if already small or unreadable
+
+    Raises Image.DecompressionBombError for images declaring too many pixels to decode safely
+    """
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        if max(img.size) <= MAX_IMAGE_SIDE:
+            return image_bytes
+        # JPEGs decode straight to a reduced DCT scale near the target instead of full size
+        scale = MAX_IMAGE_SIDE / max(img.size)
+        img.draft("RGB", (round(img.width * scale), round(img.height * scale)))
+        img.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.convert("RGB").save(buf, "JPEG", quality=85, optimize=True)
+        return buf.getvalue()
+    except (OSError, ValueError):
+        return image_bytes
+
+def encode_image(image_bytes):
+    """Downscale the image and base64 encode it (runs in a worker thread)"""
+    return pybase64.b64encode(downscale_image(image_bytes)).decode('ascii')
+
+def encode_and_cache(image_cache, lock, image_sha, image_bytes):
+    """Encode one upload and store it in the shared image cache (runs in a worker thread)"""
+    image_base64 = encode_image(image_bytes)
+    with lock:
+        image_cache[image_sha] = image_base64
+    return image_base64
+
+def start_image_preparation(uploaded_files):
+    """Start encoding uploads in the background; returns (image hash, future of its base64) for each"""
+    # Prepared images are kept across reruns and sessions so widget clicks don't redo the work
+    image_cache, lock = get_image_cache()
+    # Encodes still running from an earlier rerun are picked up instead of started again
+    running = st.session_state.setdefault("image_futures", {})
+    prepared = []
+    for uploaded_file in uploaded_files:
+        image_bytes = uploaded_file.getvalue()
+        image_sha = hashlib.sha256(image_bytes).hexdigest()
+        with lock:
+            cached = image_cache.get(image_sha)
+        if cached is not None:
+            running.pop(image_sha, None)
+            future = Future()
+            future.set_result(cached)
+        elif image_sha in running:
+            future = running[image_sha]
         else:
-            prompt = "Describe this image in detail in English."
-        
-        # Call Ollama for VLM
-        vlm_response = requests.post(
-            f"{OLLAMA_HOST}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "images": [image_base64],
-                "stream": False
-            },
-            timeout=120
+            future = running[image_sha] = get_executor().submit(
+                encode_and_cache, image_cache, lock, image_sha, image_bytes
+            )
+        prepared.append((image_sha, future))
+    return prepared
+
+def wait_for_images(prepared):
+    """Wait for every upload to be encoded, with a progress bar; returns (image hash, base64) pairs
+
+    The base64 is None for images rejected as decompression bombs
+    """
+    futures = [future for _, future in prepared if not future.done()]
+    if futures:
+        progress = st.progress(0.0, text="Preparing images...")
+        for done, _ in enumerate(as_completed(futures), 1):
+            progress.progress(done / len(futures), text=f"Preparing images... {done}/{len(futures)}")
+        progress.empty()
+    
+    # Forget failed encodes so the next click retries them instead of re-raising the same error
+    running = st.session_state.get("image_futures", {})
+    images = []
+    for image_sha, future in prepared:
+        if future.exception() is not None:
+            running.pop(image_sha, None)
+        if isinstance(future.exception(), Image.DecompressionBombError):
+            images.append((image_sha, None))
+        else:
+            images.append((image_sha, future.result()))
+    return images
+
+def warm_up_model(client, model):
+    """Load the model ahead of the first real request (runs in a worker thread)"""
+    try:
+        # An empty prompt only loads the weights; nothing is generated
+        client.post(
+            "/api/generate",
+            content=orjson.dumps({"model": model, "prompt": "", "keep_alive": KEEP_ALIVE}),
+            headers={"Content-Type": "application/json"},
+            timeout=httpx.Timeout(300, connect=CONNECT_TIMEOUT)
         )
-        
-        if vlm_response.status_code != 200:
-            return None, f"VLM error: {vlm_response.status_code}"
-        
-        english_desc = vlm_response.json().get('response', '').strip()
-        
-        # Step 2: Translate if needed
-        if language.lower() == 'english':
-            return english_desc, None
-        
-        # Translate
-        trans_response = requests.post(
-            f"{OLLAMA_HOST}/api/generate",
-            json={
-                "model": TRANSLATOR_MODEL,
-                "prompt": f"Translate to {language}:\n\n{english_desc}",
-                "stream": False
-            },
-            timeout=60
+    except httpx.HTTPError:
+        pass  # Best effort; the first real request will load the model instead
+
+def start_warm_up(host, model):
+    """Warm the model in the background unless it's already loaded or another session is warming it"""
+    loaded_models = get_loaded_models(host)
+    if loaded_models is None or model in loaded_models:
+        return
+    state, lock = get_warming_models()
+    with lock:
+        if (host, model) in state["warming"]:
+            return
+        state["warming"].add((host, model))
+    
+    def finished(_):
+        with lock:
+            state["warming"].discard((host, model))
+            state["finished"] += 1
+    get_warm_up_executor().submit(warm_up_model, get_http_client(host), model).add_done_callback(finished)
+
+def stream_generate(payload, timeout):
+    """Yield response tokens from Ollama's streaming generate endpoint"""
+    # orjson encodes the multi-MB base64 image much faster than the stdlib encoder
+    with get_http_client(OLLAMA_HOST).stream(
+        "POST",
+        "/api/generate",
+        content=orjson.dumps({**payload, "stream": True}),
+        headers={"Content-Type": "application/json"},
+        timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT)
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            try:
+                chunk = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                raise httpx.HTTPError(f"Invalid stream chunk from Ollama: {e}") from e
+            # Ollama reports mid-stream failures as an error chunk on a 200 response
+            if 'error' in chunk:
+                raise httpx.HTTPError(chunk['error'])
+            yield chunk.get('response', '')
+            if chunk.get('done'):
+                break
+
+def vlm_options(language):
+    """Cap VLM output; the Amharic path only needs one short sentence"""
+    return {
+        "num_predict": 120 if language == 'Amharic' else 400,
+        "num_ctx": VLM_CONTEXT_TOKENS,
+        "temperature": 0.2,
+        "top_p": 0.9
+    }
+
+def translation_options(english_desc, language_count=1):
+    """Cap translator output relative to the length of the English text"""
+    budget = max(MIN_TRANSLATION_TOKENS, TRANSLATION_TOKENS_PER_WORD * len(english_desc.split()))
+    return {"num_predict": budget * language_count, "temperature": 0.2, "top_p": 0.9}
+
+def vlm_output_language(model, language):
+    """Return the language itself if the VLM can describe in it directly, else English"""
+    if language.lower() in VLM_NATIVE_LANGS.get(model, {"english"}):
+        return language
+    return 'English'
+
+def vlm_cache_key(model, image_sha, language):
+    """Key a description on its prompt branch: short Amharic-bound English, or detailed in the output language"""
+    bucket = 'amharic' if language == 'Amharic' else vlm_output_language(model, language).lower()
+    return ("vlm", model, image_sha, bucket)
+
+def description_language(model, image_sha, target_languages):
+    """Language to ask the VLM for; several targets share one English description"""
+    if len(target_languages) != 1:
+        return 'English'
+    language = target_languages[0]
+    # Switching language on an already described image only pays for the translator
+    if (cache_get(vlm_cache_key(model, image_sha, language)) is None
+            and cache_get(vlm_cache_key(model, image_sha, 'English')) is not None):
+        return 'English'
+    return language
+
+def translation_languages(model, language, target_languages):
+    """Targets left for the translator once the VLM has described in the given language"""
+    vlm_language = vlm_output_language(model, language)
+    return [
+        lang for lang in target_languages
+        if lang.lower() not in ('english', vlm_language.lower())
+    ]
+
+def vlm_request(model, image_sha, image_base64, language):
+    """Return the cache key and generate payload for describing one image"""
+    if language == 'Amharic':
+        prompt = "Describe this image in one short English sentence."
+    else:
+        output_language = vlm_output_language(model, language)
+        prompt = "Describe this image in detail."
+        if output_language.lower() != 'english':
+            prompt += f" Respond in {output_language}."
+    
+    return vlm_cache_key(model, image_sha, language), {
+        "model": model,
+        "prompt": prompt,
+        "images": [image_base64],
+        "options": vlm_options(language),
+        "keep_alive": KEEP_ALIVE
+    }
+
+def generate_vlm_description(model, image_sha, image_base64, language):
+    """Stream a description of the image from the VLM, cached by image hash"""
+    key, payload = vlm_request(model, image_sha, image_base64, language)
+    return cached_stream(key, lambda: stream_generate(payload, timeout=120))
+
+def async_client():
+    """HTTP/2 client for concurrent calls; its pool is bound to one event loop, so open it per asyncio.run"""
+    return httpx.AsyncClient(
+        base_url=OLLAMA_HOST,
+        timeout=httpx.Timeout(180, connect=CONNECT_TIMEOUT),
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
         )
+    )
+
+async def post_generate_async(client, payload):
+    """Run one non-streaming generate call and return the stripped response text"""
+    response = await client.post(
+        "/api/generate",
+        content=orjson.dumps({**payload, "stream": False}),
+        headers={"Content-Type": "application/json"}
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content).get('response', '').strip()
+
+async def describe_images_async(model, images, target_languages):
+    """Describe and translate several images concurrently over one HTTP/2 connection, filling the cache"""
+    async def describe(client, image_sha, image_base64):
+        language = description_language(model, image_sha, target_languages)
+        translations = translation_languages(model, language, target_languages)
+        key, payload = vlm_request(model, image_sha, image_base64, language)
+        description = cache_get(key)
+        if description is None:
+            description = await post_generate_async(client, payload)
+            if not description:
+                return
+            cache_put(key, description)
         
-        if trans_response.status_code != 200:
-            return english_desc, f"Translation failed. English: {english_desc}"
-        
-        translated = trans_response.json().get('response', '').strip()
-        return translated, english_desc
-        
-    except Exception as e:
-        return None, f"Error: {str(e)}"
+        # Translate as soon as this image is described, while the others are still running
+        pending = [
+            (key, payload) for key, payload in
+            (translation_request(description, lang) for lang in translations)
+            if cache_get(key) is None
+        ]
+        results = await asyncio.gather(*(post_generate_async(client, payload) for _, payload in pending))
+        for (key, _), text in zip(pending, results):
+            if text:
+                cache_put(key, text)
+    
+    async with async_client() as client:
+        # Failures aren't cached, so the per-image render retries them and shows the error
+        await asyncio.gather(
+            *(describe(client, image_sha, image_base64) for image_sha, image_base64 in images),
+            return_exceptions=True
+        )
+
+def translation_request(english_desc, language):
+    """Return the cache key and generate payload for one translation"""
+    key = ("translation", hashlib.sha256(english_desc.encode()).hexdigest(), language)
+    return key, {
+        "model": TRANSLATOR_MODEL,
+        "system": TRANSLATOR_SYSTEM,
+        "prompt": f"{language}: {english_desc}",
+        "options": translation_options(english_desc),
+        "keep_alive": KEEP_ALIVE
+    }
+
+def translate_description(english_desc, language):
+    """Stream a translation of the English description, cached by text hash"""
+    key, payload = translation_request(english_desc, language)
+    return cached_stream(key, lambda: stream_generate(payload, timeout=60))
+
+def translate_descriptions(english_desc, languages):
+    """Translate into several languages with a single translator call"""
+    text_sha = hashlib.sha256(english_desc.encode()).hexdigest()
+    results = {lang: cache_get(("translation", text_sha, lang)) for lang in languages}
+    missing = [lang for lang, text in results.items() if text is None]
+    if not missing:
+        return results
+    
+    # One prefill for every language instead of one translator call each
+    response = get_http_client(OLLAMA_HOST).post(
+        "/api/generate",
+        content=orjson.dumps({
+            "model": TRANSLATOR_MODEL,
+            "system": MULTI_TRANSLATOR_SYSTEM,
+            "prompt": f"{orjson.dumps(missing).decode()}: {english_desc}",
+            "format": "json",
+            "options": translation_options(english_desc, len(missing)),
+            "keep_alive": KEEP_ALIVE,
+            "stream": False
+        }),
+        headers={"Content-Type": "application/json"},
+        timeout=httpx.Timeout(120, connect=CONNECT_TIMEOUT)
+    )
+    response.raise_for_status()
+    try:
+        translations = orjson.loads(orjson.loads(response.content).get('response', '{}'))
+    except orjson.JSONDecodeError:
+        translations = {}
+    if not isinstance(translations, dict):
+        translations = {}
+    
+    for lang in missing:
+        text = translations.get(lang)
+        results[lang] = text.strip() if isinstance(text, str) else ''
+        if results[lang]:
+            cache_put(("translation", text_sha, lang), results[lang])
+    
+    # Anything the JSON reply left out gets its own call, all in one concurrent round
+    missing = [lang for lang in missing if not results[lang]]
+    if missing:
+        results.update(asyncio.run(translate_languages_async(english_desc, missing)))
+    return results
+
+async def translate_languages_async(english_desc, languages):
+    """Translate into each language with concurrent single-language calls, filling the cache"""
+    pending = [translation_request(english_desc, lang) for lang in languages]
+    async with async_client() as client:
+        texts = await asyncio.gather(*(post_generate_async(client, payload) for _, payload in pending))
+    for (key, _), text in zip(pending, texts):
+        if text:
+            cache_put(key, text)
+    return dict(zip(languages, texts))
+
+def write_stream_text(stream):
+    """Render a token stream and return its text; st.write_stream returns a list when nothing was written"""
+    output = st.write_stream(stream)
+    return output.strip() if isinstance(output, str) else ""
+
+def render_description(model, image_sha, image_base64, target_languages):
+    """Stream the description and translations for one image; returns {language: text}"""
+    # The short English prompt helps Amharic translation
+    prompt_language = description_language(model, image_sha, target_languages)
+    vlm_language = vlm_output_language(model, prompt_language)
+    translations = translation_languages(model, prompt_language, target_languages)
+    english_desc = None
+    results = {}
+    
+    # Step 1: Stream description (English unless the VLM speaks the target)
+    try:
+        st.markdown(f"### 📝 Description ({model})")
+        english_desc = write_stream_text(
+            generate_vlm_description(model, image_sha, image_base64, prompt_language)
+        )
+        if not english_desc:
+            raise httpx.HTTPError(f"{model} returned an empty description")
+        if len(translations) < len(target_languages) or not target_languages:
+            results[vlm_language] = english_desc
+    except httpx.HTTPError as e:
+        st.markdown('<div class="error-box">', unsafe_allow_html=True)
+        st.error(f"Failed: VLM error: {e}")
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Step 2: Stream a single translation, or batch several into one call
+    if english_desc and translations:
+        try:
+            if len(translations) == 1:
+                st.markdown(f"### 🌍 {translations[0]} Translation")
+                translated_text = write_stream_text(translate_description(english_desc, translations[0]))
+                if not translated_text:
+                    raise ValueError(f"Empty {translations[0]} translation")
+                results[translations[0]] = translated_text
+            else:
+                with st.spinner(f"Translating to {', '.join(translations)}..."):
+                    translated = translate_descriptions(english_desc, translations)
+                st.markdown("### 🌍 Translations")
+                for tab, lang in zip(st.tabs(translations), translations):
+                    with tab:
+                        st.write(translated[lang] or "Translation failed.")
+                results.update({lang: text for lang, text in translated.items() if text})
+        except (httpx.HTTPError, ValueError):
+            st.markdown('<div class="error-box">', unsafe_allow_html=True)
+            st.error("Translation failed. English description shown above.")
+            st.markdown('</div>', unsafe_allow_html=True)
+            results.setdefault('English', english_desc)
+    
+    return results
 
 # ========== MAIN APP ==========
 st.markdown('<h1 class="main-header">🖼️ AI Image Description Generator</h1>', unsafe_allow_html=True)
@@ -129,12 +577,14 @@ with st.sidebar:
     # Connection status
     st.markdown("### 🔗 Ollama Connection")
     if st.button("Test Connection", use_container_width=True):
-        with st.spinner("Testing..."):
-            success, msg = test_ollama_connection()
-            if success:
-                st.success(msg)
-            else:
-                st.error(msg)
+        # Force a fresh probe instead of the cached status
+        test_ollama_connection.clear()
+    with st.spinner("Testing..."):
+        success, msg = test_ollama_connection(OLLAMA_HOST)
+    if success:
+        st.success(msg)
+    else:
+        st.error(msg)
     
     st.divider()
     
@@ -147,13 +597,39 @@ with st.sidebar:
     )
     st.caption(VLM_MODELS[selected_model])
     
+    # Start loading a newly selected model in the background while the user picks an image
+    if st.session_state.get("warmed_model") != selected_model:
+        # The translator is shared by every VLM, so it only needs loading on the first render
+        if "warmed_model" not in st.session_state:
+            start_warm_up(OLLAMA_HOST, TRANSLATOR_MODEL)
+        st.session_state["warmed_model"] = selected_model
+        start_warm_up(OLLAMA_HOST, selected_model)
+    
+    # Both stages need their model resident, or every request pays for a model swap
+    # Models still warming up aren't expected to be resident yet, so they don't count
+    warm_ups = {m: warm_up_state(OLLAMA_HOST, m) for m in (selected_model, TRANSLATOR_MODEL)}
+    warm_ups_finished = max(finished for _, finished in warm_ups.values())
+    loaded_models = get_loaded_models(OLLAMA_HOST, warm_ups_finished) if success else None
+    if loaded_models is not None:
+        not_loaded = [m for m, (warming, _) in warm_ups.items() if not warming and m not in loaded_models]
+        if not_loaded:
+            st.warning(
+                f"Not loaded: {', '.join(not_loaded)}. If this persists, start Ollama with "
+                "`OLLAMA_MAX_LOADED_MODELS=3` (see Instructions)."
+            )
+    
     # Language selection
-    st.markdown("### 🌍 Select Language")
-    target_language = st.selectbox(
-        "Output Language",
-        ["English", "Chinese", "Amharic", "French", "Spanish"],
+    st.markdown("### 🌍 Select Languages")
+    all_languages = st.checkbox("All languages")
+    target_languages = st.multiselect(
+        "Output Languages",
+        LANGUAGES,
+        default=["English"],
+        disabled=all_languages,
         label_visibility="collapsed"
     )
+    if all_languages:
+        target_languages = LANGUAGES
     
     st.divider()
     st.markdown('<div class="info-box">', unsafe_allow_html=True)
@@ -167,51 +643,66 @@ tab1, tab2 = st.tabs(["📷 Upload Image", "📖 Instructions"])
 
 with tab1:
     # File upload
-    uploaded_file = st.file_uploader(
-        "Choose an image (JPG, PNG)",
+    uploaded_files = st.file_uploader(
+        "Choose images (JPG, PNG)",
         type=['jpg', 'jpeg', 'png'],
+        accept_multiple_files=True,
         label_visibility="collapsed"
     )
     
-    if uploaded_file:
-        # Display image
-        st.image(uploaded_file, use_column_width=True)
+    if uploaded_files:
+        # Display images
+        columns = st.columns(min(len(uploaded_files), 3))
+        for i, uploaded_file in enumerate(uploaded_files):
+            with columns[i % len(columns)]:
+                try:
+                    st.image(uploaded_file, caption=uploaded_file.name, use_column_width=True)
+                except Image.DecompressionBombError:
+                    st.warning(f"{uploaded_file.name} is too large to preview.")
         
-        # Convert to base64
-        image_base64 = base64.b64encode(uploaded_file.getvalue()).decode()
+        # Hash the raw bytes for the cache key, and downscale and encode in the background
+        # while the user picks a model and languages
+        prepared_images = start_image_preparation(uploaded_files)
         
         # Generate button
         if st.button("🚀 Generate Description", type="primary", use_container_width=True):
-            with st.spinner(f"Processing with {selected_model}..."):
-                result, error_or_english = generate_description(
-                    selected_model,
-                    image_base64,
-                    target_language
-                )
-                
-                if result:
-                    st.markdown("### ✅ Description Generated")
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.write(result)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    # Download button
-                    st.download_button(
-                        "📥 Download Result",
-                        data=result,
-                        file_name=f"description_{target_language}.txt"
-                    )
-                    
-                    # Show English original if translated
-                    if target_language.lower() != 'english' and error_or_english:
-                        with st.expander("View Original English"):
-                            st.write(error_or_english)
-                else:
+            images = wait_for_images(prepared_images)
+            
+            # Describe and translate every image at once; the per-image sections below then read the cache
+            readable = [(image_sha, image_base64) for image_sha, image_base64 in images if image_base64]
+            if len(readable) > 1:
+                with st.spinner(f"Describing {len(readable)} images with {selected_model}..."):
+                    asyncio.run(describe_images_async(selected_model, readable, target_languages))
+            
+            all_results = []
+            for uploaded_file, (image_sha, image_base64) in zip(uploaded_files, images):
+                if len(uploaded_files) > 1:
+                    st.markdown(f"## 🖼️ {uploaded_file.name}")
+                if image_base64 is None:
                     st.markdown('<div class="error-box">', unsafe_allow_html=True)
-                    st.error(f"Failed: {error_or_english}")
+                    st.error(f"Failed: {uploaded_file.name} is too large to process.")
                     st.markdown('</div>', unsafe_allow_html=True)
+                    continue
+                results = render_description(selected_model, image_sha, image_base64, target_languages)
+                if results:
+                    all_results.append((uploaded_file.name, results))
+            
+            if all_results:
+                # Download button
+                sections = []
+                for name, results in all_results:
+                    text = "\n\n".join(
+                        f"[{lang}]\n{desc}" if len(results) > 1 else desc
+                        for lang, desc in results.items()
+                    )
+                    sections.append(f"=== {name} ===\n{text}" if len(uploaded_files) > 1 else text)
+                st.download_button(
+                    "📥 Download Result",
+                    data="\n\n".join(sections),
+                    file_name=f"description_{'_'.join(all_results[0][1])}.txt"
+                )
     else:
-        st.info("👈 Please upload an image to begin")
+        st.info("👈 Please upload images to begin")
 
 with tab2:
     st.header("📚 Complete Setup Guide")
@@ -226,8 +717,9 @@ ollama pull llava:latest
 ollama pull moondream:1.8b
 ollama pull qwen2:7b
 
-# Start Ollama server
-ollama serve
+# Start Ollama server: keep both VLMs and the translator loaded together,
+# serve several requests (images or languages) in parallel, and don't unload after 5 minutes idle
+OLLAMA_NUM_PARALLEL=4 OLLAMA_MAX_LOADED_MODELS=3 OLLAMA_KEEP_ALIVE=30m ollama serve
 """)
     
     st.markdown("### Step 2: Make Ollama Public with Ngrok")
@@ -263,5 +755,5 @@ OLLAMA_HOST = "https://your-ngrok-url.ngrok.io"
 
 # Footer
 st.divider()
-st.caption(f"Ollama Server: `{OLLAMA_HOST}` | Model: `{selected_model}` | Language: `{target_language}`")
+st.caption(f"Ollama Server: `{OLLAMA_HOST}` | Model: `{selected_model}` | Languages: `{', '.join(target_languages)}`")
 st.caption("💡 **Note**: Keep your Ollama server running while using this app")